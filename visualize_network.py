@@ -1,33 +1,41 @@
-import boto3
-import xml.etree.cElementTree as ET
+from xml_backend import ET
+import copy
+import functools
+import logging
 import math
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+import sys
 import argparse
+from operator import itemgetter
 import os
 import errno
 
 #update this if deploying to lambda
 LAMBDA_INVOCATION = False
 
-# command line arguments
-parser = argparse.ArgumentParser(description='VPC Network Visualizer')
-
-# positional, required args
-parser.add_argument('profile', help='aws profile')
-parser.add_argument('region', help='aws region')
-parser.add_argument('vpc', help='vpc id')
-
-# value-based args
-parser.add_argument('--outdir', dest='directory', help='output save directory', default="")
-parser.add_argument('--stroke', dest='stroke', help='line stroke width', default=3, type=int)
-parser.add_argument('--text', dest='line_height', help='text line height', default=20, type=int)
-parser.add_argument('--subcols', dest='sub_cols', help='subnet alignment columns', default=3, type=int)
-parser.add_argument('--peercols', dest='peer_cols', help='peer VPC alignment columns', default=1, type=int)
-parser.add_argument('--fontl', dest='font_large', help='large font size', default=16, type=int)
-
-# true/false args
-parser.add_argument('--all', '-a', dest='all_resources', action='store_true', help='show non associated resources')
-parser.add_argument('--linelabels', '-l', dest='labels', action='store_true', help='add connection labels')
-parser.add_argument('--rtconnections', '-c', dest='rt_connections', action='store_true', help='add route table connections')
+def build_parser():
+    """build the command line parser (skipped entirely in lambda mode)"""
+    parser = argparse.ArgumentParser(description='VPC Network Visualizer')
+
+    # positional, required args
+    parser.add_argument('profile', help='aws profile')
+    parser.add_argument('region', help='aws region')
+    parser.add_argument('vpc', help='vpc id')
+
+    # value-based args
+    parser.add_argument('--outdir', dest='directory', help='output save directory', default="")
+    parser.add_argument('--stroke', dest='stroke', help='line stroke width', default=3, type=int)
+    parser.add_argument('--text', dest='line_height', help='text line height', default=20, type=int)
+    parser.add_argument('--subcols', dest='sub_cols', help='subnet alignment columns', default=3, type=int)
+    parser.add_argument('--peercols', dest='peer_cols', help='peer VPC alignment columns', default=1, type=int)
+    parser.add_argument('--fontl', dest='font_large', help='large font size', default=16, type=int)
+
+    # true/false args
+    parser.add_argument('--all', '-a', dest='all_resources', action='store_true', help='show non associated resources')
+    parser.add_argument('--linelabels', '-l', dest='labels', action='store_true', help='add connection labels')
+    parser.add_argument('--rtconnections', '-c', dest='rt_connections', action='store_true', help='add route table connections')
+    return parser
 
 class DefaultLambdaNamespace:
     """Class that returns argparse-like default argument dict"""
@@ -51,7 +59,7 @@ def get_configuration(lambda_invocation):
                                        sub_cols=3,
                                        vpc='NONE'), kwargs)
     else:
-        args = parser.parse_args()
+        args = build_parser().parse_args()
         kwargs['profile_name'] = args.profile
         kwargs['region_name'] = args.region
         return (args, kwargs)
@@ -59,36 +67,45 @@ def get_configuration(lambda_invocation):
 # parse cmd line args
 (args, kwargs) = get_configuration(LAMBDA_INVOCATION)
 
-SESSION = boto3.Session(**kwargs)
+# boto3 costs ~300ms to import; in lambda that is paid on every cold start,
+# so the import and session construction are deferred until first AWS use
+SESSION = None
+
+def get_session():
+    global SESSION
+    if SESSION is None:
+        import boto3
+        SESSION = boto3.Session(**kwargs)
+    return SESSION
 
 # draw.io specific resource shapes
-ROUTE53_SHAPE = "mxgraph.aws3.route_53"
-ROUTE_TABLE_SHAPE = "mxgraph.aws3.route_table"
-INTERNET_GATEWAY_SHAPE = "mxgraph.aws3.internet_gateway"
-ENI_SHAPE = "mxgraph.aws3.elastic_network_interface"
-PEERING_SHAPE = "mxgraph.aws3.vpc_peering"
-NAT_GATEWAY_SHAPE = "mxgraph.aws3.vpc_nat_gateway"
-NACL_SHAPE = "mxgraph.aws3.network_access_controllist"
-VPC_SHAPE = "mxgraph.aws3.virtual_private_cloud"
-SUBNET_SHAPE = "mxgraph.aws3.permissions"
-FLOW_LOGS_SHAPE = "mxgraph.aws3.flow_logs"
-ENDPTS_SHAPE = "mxgraph.aws3.endpoints"
-VPN_SHAPE = "mxgraph.aws3.vpn_gateway"
-VPN_CONN_SHAPE = "mxgraph.aws3.vpn_connection"
-GENERIC_SERVER_SHAPE = "mxgraph.aws3.traditional_server"
-DIRECT_CONNECT_SHAPE = "mxgraph.aws3.direct_connect"
-AWS_CLOUD_SHAPE = "mxgraph.aws3.cloud"
+ROUTE53_SHAPE = sys.intern("mxgraph.aws3.route_53")
+ROUTE_TABLE_SHAPE = sys.intern("mxgraph.aws3.route_table")
+INTERNET_GATEWAY_SHAPE = sys.intern("mxgraph.aws3.internet_gateway")
+ENI_SHAPE = sys.intern("mxgraph.aws3.elastic_network_interface")
+PEERING_SHAPE = sys.intern("mxgraph.aws3.vpc_peering")
+NAT_GATEWAY_SHAPE = sys.intern("mxgraph.aws3.vpc_nat_gateway")
+NACL_SHAPE = sys.intern("mxgraph.aws3.network_access_controllist")
+VPC_SHAPE = sys.intern("mxgraph.aws3.virtual_private_cloud")
+SUBNET_SHAPE = sys.intern("mxgraph.aws3.permissions")
+FLOW_LOGS_SHAPE = sys.intern("mxgraph.aws3.flow_logs")
+ENDPTS_SHAPE = sys.intern("mxgraph.aws3.endpoints")
+VPN_SHAPE = sys.intern("mxgraph.aws3.vpn_gateway")
+VPN_CONN_SHAPE = sys.intern("mxgraph.aws3.vpn_connection")
+GENERIC_SERVER_SHAPE = sys.intern("mxgraph.aws3.traditional_server")
+DIRECT_CONNECT_SHAPE = sys.intern("mxgraph.aws3.direct_connect")
+AWS_CLOUD_SHAPE = sys.intern("mxgraph.aws3.cloud")
 
 # colors
-BLACK = "#000000"
-GREEN = "#00ff00"
-BLUE = "#0000ff"
-RED = "#ff0000"
+BLACK = sys.intern("#000000")
+GREEN = sys.intern("#00ff00")
+BLUE = sys.intern("#0000ff")
+RED = sys.intern("#ff0000")
 
 # aws icon specific colors
-ICON_ORANGE = "#F58536"
-AWS_BORDER_ORANGE = "#F59D56"
-ICON_GOLD = "#D9A741"
+ICON_ORANGE = sys.intern("#F58536")
+AWS_BORDER_ORANGE = sys.intern("#F59D56")
+ICON_GOLD = sys.intern("#D9A741")
 
 # draw.io diagram dimensions
 DIAGRAM_WIDTH = 4000
@@ -158,40 +175,83 @@ ADD_ROUTE_TABLE_CONNECTIONS = args.rt_connections
 OMIT_NON_ASSOCIATED_RESOURCES = not args.all_resources
 
 # when determining a resource's human-friendly name, try this if 'Name' not present
-SECOND_NAME_FIELD = 'aws:cloudformation:logical-id'
+SECOND_NAME_FIELD = sys.intern('aws:cloudformation:logical-id')
+
+# human-friendly names for the route origin values the EC2 API returns
+_ORIGIN_MAP = {
+    'EnableVgwRoutePropagation': 'Propagated',
+    'CreateRoute': 'Create Route',
+    'CreateRouteTable': 'Create Table',
+}
 
 # used as a placeholder for adding horizontal lines to lists
-HORIZONTAL_LINE = "horiz_line"
+HORIZONTAL_LINE = sys.intern("horiz_line")
 
 # used as an organization placeholder
-NO_AZ = 'no_az'
+NO_AZ = sys.intern('no_az')
 
 # custom connection entries
-CONNECTION_ENTRY_NONE = ""
-CONNECTION_ENTRY_RIGHT = "entryX=1;entryY=0.5;"
-CONNECTION_ENTRY_LEFT = "entryX=0;entryY=0.5;"
+CONNECTION_ENTRY_NONE = sys.intern("")
+CONNECTION_ENTRY_RIGHT = sys.intern("entryX=1;entryY=0.5;")
+CONNECTION_ENTRY_LEFT = sys.intern("entryX=0;entryY=0.5;")
+
+# style templates built once at import; only the per-call slots (colors,
+# entry point, stroke width, arc size) are filled in on the hot paths
+_EDGE_STYLE_TMPL = "edgeStyle=orthogonalEdgeStyle;rounded={};endArrow=async;strokeColor=%s;fillColor=%s;html=1;%sjettySize=auto;orthogonalLoop=1;strokeWidth=%s;".format(CONNECTIONS_ROUNDED)
+_CONTAINER_STYLE_TMPL = "rounded=1;arcSize=%s;dashed=0;strokeColor=#000000;fillColor=none;gradientColor=none;strokeWidth=2;"
+_FONT_VALUE_TMPL = "<font style='font-size: %spx'; color='%s'>%s</font>"
+_CONTAINER_ICON_STYLE_TMPL = "dashed=0;html=1;shape=%s;fillColor=%s;gradientColor=none;dashed=0;"
+_ICON_STYLE_TMPL = "outlineConnect=0;dashed=0;verticalLabelPosition=bottom;verticalAlign=top;align=center;html=1;shape=%s;fillColor=%s;gradientColor=none;"
+AZ_STYLE = f"rounded=1;arcSize=10;dashed=1;strokeColor={AWS_BORDER_ORANGE};fillColor=none;gradientColor=none;dashPattern=8 4;strokeWidth=2;"
+REGION_STYLE = "rounded=1;arcSize=6;dashed=1;strokeColor=#000000;fillColor=none;gradientColor=none;dashPattern=8 4;strokeWidth=2;"
+
+# the mxGraphModel attributes never vary between documents; build the dict
+# once instead of re-keying ~15 attributes per create_xml_doc call
+_MXGRAPH_MODEL_ATTRS = {
+    "dx": "950",
+    "dy": "464",
+    "grid": "1",
+    "gridSize": "10",
+    "guides": "1",
+    "tooltips": "1",
+    "connect": "1",
+    "arrows": "1",
+    "fold": "1",
+    "page": "1",
+    "pageScale": "1",
+    "pageWidth": str(DIAGRAM_WIDTH),
+    "pageHeight": str(DIAGRAM_HEIGHT),
+    "background": "#ffffff",
+    "math": "0",
+    "shadow": "0",
+}
 
 def create_xml_doc():
-    return ET.Element("mxGraphModel",
-                        dx="950",
-                        dy="464",
-                        grid="1",
-                        gridSize="10",
-                        guides="1",
-                        tooltips="1",
-                        connect="1",
-                        arrows="1",
-                        fold="1",
-                        page="1",
-                        pageScale="1",
-                        pageWidth="{}".format(DIAGRAM_WIDTH),
-                        pageHeight="{}".format(DIAGRAM_HEIGHT),
-                        background="#ffffff",
-                        math="0",
-                        shadow="0")
-
+    return ET.Element("mxGraphModel", attrib=_MXGRAPH_MODEL_ATTRS)
+
+@functools.lru_cache(maxsize=None)
+def get_client(service):
+    #boto3 client construction parses the botocore service model (hundreds
+    #of ms), so every caller shares one client per service; the connection
+    #pool is sized for the describe/upload thread pools (default 10 would
+    #throttle them) and retries back off adaptively under api throttling
+    from botocore.config import Config
+    config = Config(max_pool_connections=16,
+                    retries={'mode': 'adaptive', 'max_attempts': 10})
+    return get_session().client(service, config=config)
+
+def describe_all(client, op, **op_kwargs):
+    """run a describe operation through its paginator (when one exists) so
+    results beyond the first page are not silently dropped"""
+    if client.can_paginate(op):
+        return client.get_paginator(op).paginate(**op_kwargs).build_full_result()
+    return getattr(client, op)(**op_kwargs)
+
+@functools.lru_cache(maxsize=1)
 def get_account_number():
-    return SESSION.client('sts').get_caller_identity().get('Account')
+    #the account never changes for the process lifetime, so cache the
+    #sts round-trip (and the client construction) after the first call
+    return get_client('sts').get_caller_identity().get('Account')
 
 def make_save_location(dir):
     if dir:
@@ -204,43 +264,59 @@ def make_save_location(dir):
                 raise
     return os.path.join(dir, '')
 
+# sentinel for if_in so a single .get distinguishes "missing" from falsy values
+_MISS = object()
+
 def if_in(resource, *keys):
     #check for keys in map and return the value of the first one found
     for k in keys:
-        if k in resource:
-            return resource[k]
+        v = resource.get(k, _MISS)
+        if v is not _MISS:
+            return v
     return ""
 
+@functools.lru_cache(maxsize=4096)
+def _fmt_label(text, font_color, font_size):
+    #labels repeat heavily across resources (ids, counts, headers), so
+    #memoize the rendered font markup
+    return _FONT_VALUE_TMPL % (font_size, font_color, text)
+
+@functools.lru_cache(maxsize=64)
+def _container_style(arc_size):
+    return _CONTAINER_STYLE_TMPL % (arc_size,)
+
+@functools.lru_cache(maxsize=None)
+def _container_id(resource_id):
+    #the same vpc/subnet container id is referenced from many connections;
+    #build it once and keep it interned so later comparisons are pointer-equal
+    return sys.intern(f"{resource_id}_container")
+
 def insert_text(xml_root, text, x, y, dx=15, dy=10, font_color=BLACK, font_size=FONT_SIZE_NORMAL):
     # add a text element
     newElement = ET.SubElement(xml_root, "mxCell",
-        id="text-{}_{}".format(text, y),
-        value="<font style='font-size: {}px'; color='{}'>{}</font>".format(font_size, font_color, text),
+        id=f"text-{text}_{y}",
+        value=_fmt_label(text, font_color, font_size),
         vertex="1",
         style="text;html=1;labelBackgroundColor=#ffffff",
         parent="1")
 
     ET.SubElement(newElement, "mxGeometry",
-        x="{}".format(x + dx),
-        y="{}".format(y + dy),
+        x=str(x + dx),
+        y=str(y + dy),
         width="50",
-        height="30").set('as','geometry')
+        height="30", attrib={'as': 'geometry'})
 
 def name_from_tags(resource):
-    if 'Tags' in resource:
-        for t in resource['Tags']:
-            if t['Key'] == 'Name':
-                return t['Value']
-        for t_other in resource['Tags']:
-            if t_other['Key'] == SECOND_NAME_FIELD:
-                return t_other['Value']
-        return ""
-    else:
+    #materialize the tag list as a dict once instead of scanning it twice
+    tags = resource.get('Tags')
+    if not tags:
         return ""
+    tag_map = {t['Key']: t['Value'] for t in tags}
+    return tag_map.get('Name') or tag_map.get(SECOND_NAME_FIELD, "")
 
 def insert_line(xml_root, x1, y1, x2, y2):
     newElement = ET.SubElement(xml_root, "mxCell",
-        id="line_{},{}_{},{}".format(x1, y1, x2, y2),
+        id=f"line_{x1},{y1}_{x2},{y2}",
         value="",
         edge="1",
         style="shape=link;html=1;shadow=0;startArrow=diamondThin;startFill=1;endArrow=async;endFill=1;jettySize=auto;orthogonalLoop=1;strokeColor=#000000;strokeWidth=1;",
@@ -249,19 +325,20 @@ def insert_line(xml_root, x1, y1, x2, y2):
     geometry = ET.SubElement(newElement, "mxGeometry",
         relative="1",
         width="50",
-        height="50")
-
-    geometry.set('as','geometry')
+        height="50",
+        attrib={'as': 'geometry'})
 
     ET.SubElement(geometry, "mxPoint",
-                x="{}".format(x1),
-                y="{}".format(y1)).set('as','sourcePoint')
+                x=str(x1),
+                y=str(y1), attrib={'as': 'sourcePoint'})
 
     ET.SubElement(geometry, "mxPoint",
-                x="{}".format(x2),
-                y="{}".format(y2)).set('as','targetPoint')
+                x=str(x2),
+                y=str(y2), attrib={'as': 'targetPoint'})
 
 class RouteGroup:
+    __slots__ = ('bundle_spacing', 'current_x', 'current_y', 'starting_direction',
+                 'additional_break', '_advance_x', '_advance_y', '_advance_break', '_build')
     def __init__(self, start_x_bundle, start_y_bundle, starting_direction, bundle_spacing=LINE_BUNDLE_SPACING, additional_break=-1):
         """RouteGroup takes a x coordinate to start stacking connections and a y coordinate to start stacking connections,
         either of these may be omitted by passing -1.  A RouteGroup object generates routes of (x,y) pairs and maintains the
@@ -273,37 +350,71 @@ class RouteGroup:
         self.starting_direction = starting_direction
         self.additional_break = additional_break
 
-        if starting_direction != X_DIRECTION and starting_direction != Y_DIRECTION:
+        #which stacking coordinates advance never changes after construction
+        self._advance_x = start_x_bundle != -1
+        self._advance_y = start_y_bundle != -1
+        self._advance_break = additional_break != -1
+
+        #pick the route shape once here so get_next_route carries no branches;
+        #get_next_route runs once per connection in the diagram
+        if starting_direction == X_DIRECTION:
+            if self._advance_break:
+                self._build = self._build_x_with_break
+            elif self._advance_y:
+                self._build = self._build_x_bundled
+            else:
+                self._build = self._build_x
+        elif starting_direction == Y_DIRECTION:
+            if self._advance_break:
+                self._build = self._build_y_with_break
+            elif self._advance_x:
+                self._build = self._build_y_bundled
+            else:
+                self._build = self._build_y
+        else:
             # complex route will return as [] and not be used when rendering connections
             print("WARNING: bad starting direction {} for route group generator. \n(Use X_DIRECTION or Y_DIRECTION)".format(starting_direction))
+            self._build = self._build_empty
 
-    def get_next_route(self, origin_x, origin_y):
-        complex_route = []
-        if self.starting_direction == X_DIRECTION:
-            complex_route.append((self.current_x, origin_y))
-            if self.current_y != -1:
-                complex_route.append((self.current_x, self.current_y))
-            if self.additional_break != -1:
-                complex_route.append((self.additional_break, self.current_y))
-
-        elif self.starting_direction == Y_DIRECTION:
-            complex_route.append((origin_x, self.current_y))
-            if self.current_x != -1:
-                complex_route.append((self.current_x, self.current_y))
-            if self.additional_break != -1:
-                complex_route.append((self.current_x, self.additional_break))
-
-        if self.current_x != -1:
-            self.current_x += self.bundle_spacing
-        if self.current_y != -1:
-            self.current_y -= self.bundle_spacing
-        if self.additional_break != -1:
-            self.additional_break -= self.bundle_spacing
+    def _build_empty(self, origin_x, origin_y):
+        return []
+
+    def _build_x(self, origin_x, origin_y):
+        return [(self.current_x, origin_y)]
 
+    def _build_x_bundled(self, origin_x, origin_y):
+        return [(self.current_x, origin_y), (self.current_x, self.current_y)]
+
+    def _build_x_with_break(self, origin_x, origin_y):
+        route = self._build_x_bundled(origin_x, origin_y) if self._advance_y else self._build_x(origin_x, origin_y)
+        route.append((self.additional_break, self.current_y))
+        return route
+
+    def _build_y(self, origin_x, origin_y):
+        return [(origin_x, self.current_y)]
+
+    def _build_y_bundled(self, origin_x, origin_y):
+        return [(origin_x, self.current_y), (self.current_x, self.current_y)]
+
+    def _build_y_with_break(self, origin_x, origin_y):
+        route = self._build_y_bundled(origin_x, origin_y) if self._advance_x else self._build_y(origin_x, origin_y)
+        route.append((self.current_x, self.additional_break))
+        return route
+
+    def get_next_route(self, origin_x, origin_y):
+        complex_route = self._build(origin_x, origin_y)
+        spacing = self.bundle_spacing
+        if self._advance_x:
+            self.current_x += spacing
+        if self._advance_y:
+            self.current_y -= spacing
+        if self._advance_break:
+            self.additional_break -= spacing
         return complex_route
 
 class DiagramContainer:
     """Generic diagram container"""
+    __slots__ = ('name', 'id', 'loc_x', 'loc_y', 'width', 'height', 'shape', 'container_id')
     def __init__(self, name, id, loc_x, loc_y, width, height, shape):
         self.name = name
         self.id = id
@@ -312,65 +423,64 @@ class DiagramContainer:
         self.width = width
         self.height = height
         self.shape = shape
-        self.container_id = "{}_container".format(self.id)
+        self.container_id = _container_id(self.id)
 
     def get_container_id(self):
         return self.container_id
 
-    def render_xml_connection(self, xml_root, other_id, text="", color=BLACK, stroke_width=STROKE_WIDTH, complex_route=[], connection_entry=CONNECTION_ENTRY_NONE):
+    def render_xml_connection(self, xml_root, other_id, text="", color=BLACK, stroke_width=STROKE_WIDTH, complex_route=None, connection_entry=CONNECTION_ENTRY_NONE):
         if CONNECTION_LABELS:
             label = text
         else:
             label = ""
         newElement = ET.SubElement(xml_root, "mxCell",
-            id="connect{}to{}".format(self.id, other_id),
-            style="edgeStyle=orthogonalEdgeStyle;rounded={};endArrow=async;strokeColor={};fillColor={};html=1;{}jettySize=auto;orthogonalLoop=1;strokeWidth={};".format(CONNECTIONS_ROUNDED,
-                                                                                                                                                color, color, connection_entry, stroke_width),
+            id=f"connect{self.id}to{other_id}",
+            style=_EDGE_STYLE_TMPL % (color, color, connection_entry, stroke_width),
             edge="1",
             value=label,
             parent="1",
-            source="{}".format(self.container_id),
-            target="{}".format(other_id))
+            source=self.container_id,
+            target=other_id)
 
-        geometry = ET.SubElement(newElement, "mxGeometry", relative="1")
-        geometry.set('as','geometry')
+        geometry = ET.SubElement(newElement, "mxGeometry", relative="1",
+            attrib={'as': 'geometry'})
 
         if complex_route:
-            array = ET.SubElement(geometry, "Array")
-            array.set('as','points')
+            array = ET.SubElement(geometry, "Array", attrib={'as': 'points'})
             for (x,y) in complex_route:
-                ET.SubElement(array, "mxPoint", x="{}".format(x), y="{}".format(y))
+                ET.SubElement(array, "mxPoint", x=str(x), y=str(y))
 
     def render_xml(self, xml_root, icon_width=30, icon_height=36, icon_dx=20, icon_dy=-20, icon_color=ICON_ORANGE, arc_size=10):
 
         newElement_container = ET.SubElement(xml_root, "mxCell",
             id=self.container_id,
             value="",
-            style="rounded=1;arcSize={};dashed=0;strokeColor=#000000;fillColor=none;gradientColor=none;strokeWidth=2;".format(arc_size),
+            style=_container_style(arc_size),
             vertex="1",
             parent="1")
 
         ET.SubElement(newElement_container, "mxGeometry",
-            x="{}".format(self.loc_x),
-            y="{}".format(self.loc_y),
-            width="{}".format(self.width),
-            height="{}".format(self.height)).set('as','geometry')
+            x=str(self.loc_x),
+            y=str(self.loc_y),
+            width=str(self.width),
+            height=str(self.height), attrib={'as': 'geometry'})
 
         newElement = ET.SubElement(xml_root, "mxCell",
             id=self.id,
             value="",
-            style="dashed=0;html=1;shape={};fillColor={};gradientColor=none;dashed=0;".format(self.shape, icon_color),
+            style=_CONTAINER_ICON_STYLE_TMPL % (self.shape, icon_color),
             vertex="1",
             parent="1")
 
         ET.SubElement(newElement, "mxGeometry",
-                    x="{}".format(self.loc_x + icon_dx),
-                    y="{}".format(self.loc_y + icon_dy),
-                    width="{}".format(icon_width),
-                    height="{}".format(icon_height)).set('as','geometry')
+                    x=str(self.loc_x + icon_dx),
+                    y=str(self.loc_y + icon_dy),
+                    width=str(icon_width),
+                    height=str(icon_height), attrib={'as': 'geometry'})
 
 class DiagramObject:
     """Generic diagram object"""
+    __slots__ = ('name', 'id', 'loc_x', 'loc_y', 'shape_id', 'parent')
     def __init__(self, name, id, loc_x, loc_y, shape, parent="1"):
         self.name = name
         self.id = id
@@ -384,44 +494,44 @@ class DiagramObject:
         newElement = ET.SubElement(xml_root, "mxCell",
             id=self.id,
             value="",
-            style="outlineConnect=0;dashed=0;verticalLabelPosition=bottom;verticalAlign=top;align=center;html=1;shape={};fillColor={};gradientColor=none;".format(self.shape_id, icon_color),
+            style=_ICON_STYLE_TMPL % (self.shape_id, icon_color),
             vertex="1",
-            parent="{}".format(self.parent))
+            parent=f"{self.parent}")
 
         ET.SubElement(newElement, "mxGeometry",
-            x="{}".format(self.loc_x),
-            y="{}".format(self.loc_y),
-            width="{}".format(width),
-            height="{}".format(height)).set('as','geometry')
+            x=str(self.loc_x),
+            y=str(self.loc_y),
+            width=str(width),
+            height=str(height), attrib={'as': 'geometry'})
 
     def get_id(self):
         return self.id
 
-    def render_xml_connection(self, xml_root, other_id, text="", color=BLACK, stroke_width=STROKE_WIDTH, complex_route=[], connection_entry=CONNECTION_ENTRY_NONE):
+    def render_xml_connection(self, xml_root, other_id, text="", color=BLACK, stroke_width=STROKE_WIDTH, complex_route=None, connection_entry=CONNECTION_ENTRY_NONE):
         if CONNECTION_LABELS:
             label = text
         else:
             label = ""
         newElement = ET.SubElement(xml_root, "mxCell",
-            id="connect{}to{}".format(self.id, other_id),
-            style="edgeStyle=orthogonalEdgeStyle;rounded={};endArrow=async;strokeColor={};fillColor={};html=1;{}jettySize=auto;orthogonalLoop=1;strokeWidth={};".format(CONNECTIONS_ROUNDED,
-                                                                                                                                                color, color, connection_entry, stroke_width),
+            id=f"connect{self.id}to{other_id}",
+            style=_EDGE_STYLE_TMPL % (color, color, connection_entry, stroke_width),
             edge="1",
             value=label,
             parent="1",
-            source="{}".format(self.id),
-            target="{}".format(other_id))
+            source=self.id,
+            target=other_id)
 
-        geometry = ET.SubElement(newElement, "mxGeometry", relative="1")
-        geometry.set('as','geometry')
+        geometry = ET.SubElement(newElement, "mxGeometry", relative="1",
+            attrib={'as': 'geometry'})
 
         if complex_route:
-            array = ET.SubElement(geometry, "Array")
-            array.set('as','points')
+            array = ET.SubElement(geometry, "Array", attrib={'as': 'points'})
             for (x,y) in complex_route:
-                ET.SubElement(array, "mxPoint", x="{}".format(x), y="{}".format(y))
+                ET.SubElement(array, "mxPoint", x=str(x), y=str(y))
 
 class DiagramList:
+    __slots__ = ('title', 'id', 'list', 'fields', 'lane_header_height', 'line_height',
+                 'col_widths', 'header_spacing')
     def __init__(self, title, id, list, fields, col_widths):
         self.title = title
         self.id = id
@@ -434,100 +544,103 @@ class DiagramList:
 
     def create_lane(self, xml_root, x, width, height, section_title):
         """Create a column in the table"""
-        lane_title = "{}_{}".format(self.title, section_title)
+        lane_title = f"{self.title}_{section_title}"
         newElement = ET.SubElement(xml_root, "mxCell",
             id=lane_title,
             value=section_title,
             style="swimlane;html=1;startSize=20;",
             vertex="1",
-            parent="{}".format(self.id))
+            parent=f"{self.id}")
 
         ET.SubElement(newElement, "mxGeometry",
-            x="{}".format(x),
-            y="{}".format(self.lane_header_height),
-            width="{}".format(width),
-            height="{}".format(height)).set('as','geometry')
+            x=str(x),
+            y=str(self.lane_header_height),
+            width=str(width),
+            height=str(height), attrib={'as': 'geometry'})
 
         return lane_title
 
     def add_entry(self, xml_root, lane, value, y_offset, width):
         """add an entry to a table"""
         newElement = ET.SubElement(xml_root, "mxCell",
-            id="{}_{}_{}".format(lane, value, y_offset),
-            value="{}".format(value),
+            id=f"{lane}_{value}_{y_offset}",
+            value=f"{value}",
             style="text;strokeColor=none;fillColor=none;align=left;verticalAlign=top;spacingLeft=4;spacingRight=4;overflow=hidden;rotatable=0;points=[[0,0.5],[1,0.5]];portConstraint=eastwest;",
             vertex="1",
-            parent="{}".format(lane))
+            parent=lane)
 
         ET.SubElement(newElement, "mxGeometry",
             x="5",
-            y="{}".format(y_offset),
-            width="{}".format(width - 10),
-            height="26").set('as','geometry')
+            y=str(y_offset),
+            width=str(width - 10),
+            height="26", attrib={'as': 'geometry'})
 
-    def render_xml_connection(self, xml_root, other_id, text="", color=BLACK, stroke_width=STROKE_WIDTH, complex_route=[]):
+    def render_xml_connection(self, xml_root, other_id, text="", color=BLACK, stroke_width=STROKE_WIDTH, complex_route=None):
         if CONNECTION_LABELS:
             label = text
         else:
             label = ""
         newElement = ET.SubElement(xml_root, "mxCell",
-            id="connect{}to{}".format(self.id, other_id),
-            style="edgeStyle=orthogonalEdgeStyle;rounded={};endArrow=async;strokeColor={};fillColor={};html=1;jettySize=auto;orthogonalLoop=1;strokeWidth={};".format(CONNECTIONS_ROUNDED,
-                                                                                                                                                                    color, color, stroke_width),
+            id=f"connect{self.id}to{other_id}",
+            style=_EDGE_STYLE_TMPL % (color, color, CONNECTION_ENTRY_NONE, stroke_width),
             edge="1",
             value=label,
             parent="1",
-            source="{}".format(self.id),
-            target="{}".format(other_id))
+            source=self.id,
+            target=other_id)
 
-        geometry = ET.SubElement(newElement, "mxGeometry", relative="1")
-        geometry.set('as','geometry')
+        geometry = ET.SubElement(newElement, "mxGeometry", relative="1",
+            attrib={'as': 'geometry'})
 
         if complex_route:
-            array = ET.SubElement(geometry, "Array")
-            array.set('as','points')
+            array = ET.SubElement(geometry, "Array", attrib={'as': 'points'})
             for (x,y) in complex_route:
-                ET.SubElement(array, "mxPoint", x="{}".format(x), y="{}".format(y))
+                ET.SubElement(array, "mxPoint", x=str(x), y=str(y))
 
     def render_xml(self, xml_root, x, y):
-        width = 0
-        for col_width in self.col_widths:
-            width += col_width
-        height = self.header_spacing + (self.line_height * len(self.list))
+        #hoist instance attributes into locals for the per-row loops below
+        col_widths = self.col_widths
+        line_height = self.line_height
+        width = sum(col_widths)
+        height = self.header_spacing + (line_height * len(self.list))
         newElement = ET.SubElement(xml_root, "mxCell",
-            id="{}".format(self.id),
-            value="{}".format(self.title),
+            id=f"{self.id}",
+            value=f"{self.title}",
             style="swimlane;html=1;childLayout=stackLayout;resizeParent=1;resizeParentMax=0;startSize=20;",
             vertex="1",
             parent="1")
 
         ET.SubElement(newElement, "mxGeometry",
-            x="{}".format(x),
-            y="{}".format(y),
-            width="{}".format(width),
-            height="{}".format(height)).set('as','geometry')
+            x=str(x),
+            y=str(y),
+            width=str(width),
+            height=str(height), attrib={'as': 'geometry'})
 
         lanes = []
         lane_x = 0
-        for f in range(len(self.fields)):
-            lanes.append(self.create_lane(xml_root, lane_x, self.col_widths[f], height - self.lane_header_height, self.fields[f]))
-            lane_x += self.col_widths[f]
-
-        y_offset = self.line_height
+        lane_height = height - self.lane_header_height
+        for col_width, field in zip(col_widths, self.fields):
+            lanes.append(self.create_lane(xml_root, lane_x, col_width, lane_height, field))
+            lane_x += col_width
+
+        add_entry = self.add_entry
+        horiz_line_base = y + int(self.header_spacing / 2) + 5
+        y_offset = line_height
         for entry in self.list:
             # check for horizontal line placeholder
             if entry == HORIZONTAL_LINE:
-                horiz_line_y = y + y_offset + int(self.header_spacing / 2) + 5
+                horiz_line_y = horiz_line_base + y_offset
                 insert_line(xml_root, x, horiz_line_y,
                             x + width, horiz_line_y)
             else:
-                for i in range(len(entry)):
-                    self.add_entry(xml_root, lanes[i], entry[i], y_offset, self.col_widths[i])
-            y_offset += self.line_height
+                for value, lane, col_width in zip(entry, lanes, col_widths):
+                    add_entry(xml_root, lane, value, y_offset, col_width)
+            y_offset += line_height
 
         return height
 
 class DirectConnectResource:
+    __slots__ = ('id', 'name', 'associations')
     def __init__(self, id, name):
         self.id = id
         self.name = name
@@ -540,14 +653,15 @@ class DirectConnectResource:
         dc_object = DiagramObject(self.id, self.id, x, y, DIRECT_CONNECT_SHAPE)
         dc_object.render_xml(xml_root, height=60)
 
-        insert_text(xml_root, "{}".format(self.name), x, y, dx=50, dy=0)
-        insert_text(xml_root, "{}".format(self.id), x, y + DIAGRAM_LINE_HEIGHT, dx=50, dy=0)
+        insert_text(xml_root, f"{self.name}", x, y, dx=50, dy=0)
+        insert_text(xml_root, f"{self.id}", x, y + DIAGRAM_LINE_HEIGHT, dx=50, dy=0)
 
         # add connections to registered associations
         for assoc in self.associations:
-            dc_object.render_xml_connection(xml_root, "{}".format(assoc), color=RED)
+            dc_object.render_xml_connection(xml_root, f"{assoc}", color=RED)
 
 class NAclResource:
+    __slots__ = ('id', 'col_suggestion', 'rules_ingress', 'rules_egress', 'name', 'x', 'list_id', '_sorted_rules')
     def __init__(self, id, name):
         self.id = id
         self.col_suggestion = 0
@@ -555,6 +669,8 @@ class NAclResource:
         self.rules_egress = []
         self.name = name
         self.x = 0
+        self.list_id = f"{id}_list"
+        self._sorted_rules = None
 
     def get_id(self):
         return self.id
@@ -564,6 +680,19 @@ class NAclResource:
             self.rules_egress.append((int(rule_number), protocol, egress, cidr_block, rule_action))
         else:
             self.rules_ingress.append((int(rule_number), protocol, egress, cidr_block, rule_action))
+        self._sorted_rules = None
+
+    def get_sorted_rules(self):
+        #sorted on first use and cached until another rule is added, so
+        #re-renders skip the O(n log n) pass; itemgetter keeps the key in C
+        if self._sorted_rules is None:
+            by_rule_number = itemgetter(0)
+            rules = sorted(self.rules_egress, key=by_rule_number)
+            #add horizontal line separator between egress and ingress rules
+            rules.append(HORIZONTAL_LINE)
+            rules.extend(sorted(self.rules_ingress, key=by_rule_number))
+            self._sorted_rules = rules
+        return self._sorted_rules
 
     def add_col_suggestion(self, suggestion):
         self.col_suggestion = suggestion
@@ -579,34 +708,30 @@ class NAclResource:
         nacl_object = DiagramObject(self.id, self.id, x, y, NACL_SHAPE)
         nacl_object.render_xml(xml_root)
 
-        insert_text(xml_root, "{}".format(self.id), x, y, dx=-30, dy=50)
-
-        sorted_rules_egress = sorted(self.rules_egress, key=lambda rule: rule[0])
-        sorted_rules_ingress = sorted(self.rules_ingress, key=lambda rule: rule[0])
+        insert_text(xml_root, f"{self.id}", x, y, dx=-30, dy=50)
 
-        #add horizontal line separator
-        sorted_rules_egress.append(HORIZONTAL_LINE)
-        sorted_rules_egress.extend(sorted_rules_ingress)
+        sorted_rules = self.get_sorted_rules()
 
         fields = ["Rule Number", "Protocol", "Egress", "Cidr Block", "Rule Action"]
         widths = [DIAGRAM_COL_WIDTH_NORMAL, DIAGRAM_COL_WIDTH_SMALL, DIAGRAM_COL_WIDTH_SMALL,
                   DIAGRAM_COL_WIDTH_OVERSIZED, DIAGRAM_COL_WIDTH_SMALL]
 
-        if len(sorted_rules_egress) > 0:
-            label = "{}  |  {}".format(self.name, self.id)
+        if len(sorted_rules) > 0:
+            label = f"{self.name}  |  {self.id}"
             if self.name == "":
                 label = self.id
 
-            DiagramList("{}".format(label),
-                        "{}_list".format(self.id),
-                        sorted_rules_egress,
+            DiagramList(label,
+                        self.list_id,
+                        sorted_rules,
                         fields,
                         widths).render_xml(xml_root, int((x - VPC_GUTTER_DIM) * 3.5) - int(1.5 * VPC_GUTTER_DIM), padding)
 
-        nacl_object.render_xml_connection(xml_root, "{}_list".format(self.id), color=RED,
+        nacl_object.render_xml_connection(xml_root, self.list_id, color=RED,
                                           complex_route=route_generator.get_next_route(x + 30, y))
 
 class NgResource:
+    __slots__ = ('id', 'subnet_id', 'name', 'igw')
     def __init__(self, id, subnet_id, name):
         self.id = id
         self.subnet_id = subnet_id
@@ -626,13 +751,14 @@ class NgResource:
         ng_object = DiagramObject(self.id, self.id, x, y, NAT_GATEWAY_SHAPE)
         ng_object.render_xml(xml_root)
 
-        insert_text(xml_root,"{}".format(self.name), x, y, dx=50, dy=0)
-        insert_text(xml_root,"{}".format(self.id), x, y + DIAGRAM_LINE_HEIGHT, dx=50, dy=0)
+        insert_text(xml_root, f"{self.name}", x, y, dx=50, dy=0)
+        insert_text(xml_root, f"{self.id}", x, y + DIAGRAM_LINE_HEIGHT, dx=50, dy=0)
 
         if self.igw != None:
             ng_object.render_xml_connection(xml_root, self.igw, color=BLUE, complex_route=[(x + (4 * PADDING), y + PADDING)])
 
 class FlowLogsResource:
+    __slots__ = ('id', 'name')
     def __init__(self, id, name):
         self.id = id
         self.name = name
@@ -644,10 +770,11 @@ class FlowLogsResource:
         fl_object = DiagramObject(self.id, self.id, x, y, FLOW_LOGS_SHAPE)
         fl_object.render_xml(xml_root, width=30, height=30)
 
-        insert_text(xml_root, "{}".format(self.name), x, y, dx=-10, dy=5)
-        insert_text(xml_root, "{}".format(self.id), x, y + DIAGRAM_LINE_HEIGHT, dx=-10, dy=5)
+        insert_text(xml_root, f"{self.name}", x, y, dx=-10, dy=5)
+        insert_text(xml_root, f"{self.id}", x, y + DIAGRAM_LINE_HEIGHT, dx=-10, dy=5)
 
 class VpcEndpointResource:
+    __slots__ = ('ids', 'service_name', 'type', 'rt_associations')
     def __init__(self, service_name, type):
         self.ids = []
         self.service_name = service_name
@@ -667,20 +794,21 @@ class VpcEndpointResource:
     def render_xml(self, xml_root, x, y, route_generator, padding=PADDING):
         vpc_e_object = DiagramObject(self.service_name, self.service_name, x, y, ENDPTS_SHAPE)
         vpc_e_object.render_xml(xml_root)
-        insert_text(xml_root,"{} {}".format(self.service_name, self.type), x, y, dx=50, dy=0)
+        insert_text(xml_root, f"{self.service_name} {self.type}", x, y, dx=50, dy=0)
 
         # add text for added vpce's
         id_y = y + DIAGRAM_LINE_HEIGHT
         for id in self.ids:
-            insert_text(xml_root,"{}".format(id), x, id_y, dx=50, dy=0)
+            insert_text(xml_root, f"{id}", x, id_y, dx=50, dy=0)
             id_y += DIAGRAM_LINE_HEIGHT
 
         # add associations
         for assoc in self.rt_associations:
-            vpc_e_object.render_xml_connection(xml_root,"{}".format(assoc), color=BLUE,
+            vpc_e_object.render_xml_connection(xml_root, f"{assoc}", color=BLUE,
                                 complex_route=route_generator.get_next_route(x, y + 30))
 
 class VpnGatewayResource:
+    __slots__ = ('id', 'name', 'vpn')
     def __init__(self, id, name, vpn):
         self.id = id
         self.name = name
@@ -699,12 +827,13 @@ class VpnGatewayResource:
             vpn_object.render_xml(xml_root)
 
             vpn_object.render_xml_connection(xml_root,self.id)
-            insert_text(xml_root,"{}".format(self.vpn), x + (3 * padding), y, dx=80, dy=20)
+            insert_text(xml_root, f"{self.vpn}", x + (3 * padding), y, dx=80, dy=20)
 
-        insert_text(xml_root,"{}".format(self.name), x, y, dx=50, dy=0)
-        insert_text(xml_root,"{}".format(self.id), x, y + DIAGRAM_LINE_HEIGHT, dx=50, dy=0)
+        insert_text(xml_root, f"{self.name}", x, y, dx=50, dy=0)
+        insert_text(xml_root, f"{self.id}", x, y + DIAGRAM_LINE_HEIGHT, dx=50, dy=0)
 
 class SubnetResource:
+    __slots__ = ('id', 'cidr', 'az', 'ng_list', 'col_suggestion', 'associations', 'name', '_dimensions')
     def __init__(self, id, cidr, az, name):
         self.id = id
         self.cidr = cidr
@@ -713,16 +842,18 @@ class SubnetResource:
         self.col_suggestion = 0
         self.associations = []
         self.name = name
+        self._dimensions = None
 
     def get_dimensions(self):
-        h = SUBNET_MIN_H
-        ng_height_requirement = len(self.ng_list) * RESOURCE_DISTRIBUTION - PADDING
-        if ng_height_requirement > h:
-            h = ng_height_requirement
-        return (SUBNET_MIN_W, h)
+        #computed lazily and cached; layout passes ask several times per subnet
+        if self._dimensions is None:
+            h = max(SUBNET_MIN_H, len(self.ng_list) * RESOURCE_DISTRIBUTION - PADDING)
+            self._dimensions = (SUBNET_MIN_W, h)
+        return self._dimensions
 
     def register_ng(self, ng_resource):
         self.ng_list.append(ng_resource)
+        self._dimensions = None
 
     def register_nacl_association(self, assoc_data):
         self.associations.append(assoc_data)
@@ -749,11 +880,11 @@ class SubnetResource:
                                             subnet_w, subnet_h, SUBNET_SHAPE)
 
         subnet_container.render_xml(xml_root,icon_color=ICON_GOLD)
-        insert_text(xml_root,"{}, CIDR: {}".format(self.id, self.cidr), x, y)
-        insert_text(xml_root,"{}".format(self.name), x, y + DIAGRAM_LINE_HEIGHT)
+        insert_text(xml_root, f"{self.id}, CIDR: {self.cidr}", x, y)
+        insert_text(xml_root, f"{self.name}", x, y + DIAGRAM_LINE_HEIGHT)
 
         for a in self.associations:
-            subnet_container.render_xml_connection(xml_root,"{}".format(a[1]), text=a[2], color=GREEN,
+            subnet_container.render_xml_connection(xml_root, f"{a[1]}", text=a[2], color=GREEN,
                         complex_route=route_generator.get_next_route(x, y + 30),
                         connection_entry=CONNECTION_ENTRY_RIGHT)
 
@@ -764,9 +895,10 @@ class SubnetResource:
             ng_y += RESOURCE_DISTRIBUTION
 
 class IgwResource:
+    __slots__ = ('id', 'vpc_id', 'name')
     def __init__(self, id, vpc_id, name):
         self.id = id
-        self.vpc_id = "{}_container".format(vpc_id)
+        self.vpc_id = _container_id(vpc_id)
         self.name = name
 
     def get_id(self):
@@ -776,14 +908,15 @@ class IgwResource:
         igw_object = DiagramObject(self.id, self.id, x, y, shape)
         igw_object.render_xml(xml_root)
 
-        insert_text(xml_root,"{}".format(self.name), x, y, dx=50, dy=0)
-        insert_text(xml_root,"{}".format(self.id), x, y + DIAGRAM_LINE_HEIGHT, dx=50, dy=0)
+        insert_text(xml_root, f"{self.name}", x, y, dx=50, dy=0)
+        insert_text(xml_root, f"{self.id}", x, y + DIAGRAM_LINE_HEIGHT, dx=50, dy=0)
 
 class NetworkInterfaceResource:
+    __slots__ = ('id', 'subnet_id', 'type')
     def __init__(self, id, subnet_id, type):
         """CURRENTLY UNUSED IN THE SCRIPT"""
         self.id = id
-        self.subnet_id = "{}_container".format(subnet_id)
+        self.subnet_id = _container_id(subnet_id)
         self.type = type
 
     def get_id(self):
@@ -794,71 +927,46 @@ class NetworkInterfaceResource:
         igw_object.render_xml(xml_root)
 
         igw_object.render_xml_connection(xml_root,self.subnet_id, text=self.type, COLOR=BLUE)
-        insert_text(xml_root,"{}".format(self.id), x, y, dx=0, dy=50)
+        insert_text(xml_root, f"{self.id}", x, y, dx=0, dy=50)
 
 class RouteTableResource:
     def __init__(self, id, name):
         self.id = id
+        self.list_id = f"{id}_list"
         self.associations = []
         self.routes = []
         self.name = name
-        self.az_connections = []
+        self.az_connections = Counter()
 
     def get_id(self):
         return self.id
 
-    def cmp_cidr(self, cidr_one_list, cidr_two_list):
-        if not cidr_one_list or not cidr_two_list:
-            #both values are the same
-            return 0
-        try:
-            #try to parse as an integer
-            val_one = int(cidr_one_list[0])
-        except:
-            return -1
-        try:
-            #try to parse as an integer
-            val_two = int(cidr_two_list[0])
-        except:
-            return 1
-        if val_one < val_two:
-            return -1
-        elif val_one > val_two:
-            return 1
-        else:
-            #recursively compare the next bytes of each cidr block
-            return self.cmp_cidr(cidr_one_list[1:], cidr_two_list[1:])
+    def cidr_key(self, route):
+        #pack the octets into one int (base 257 so non-numeric parts --
+        #prefix list names, empty strings -- sort first like the old
+        #comparator); comparing a single int beats comparing octet tuples
+        ip, _, _ = route[0].partition('/')
+        key = 0
+        for part in ip.split('.'):
+            key = key * 257 + (int(part) + 1 if part.isdigit() else 0)
+        return key
 
     def sort_routes(self):
-        #sort cidr blocks
-        cidr_sorted = sorted(self.routes, cmp=lambda cidr_one,cidr_two:
-                                                self.cmp_cidr(cidr_one.split("."), cidr_two.split(".")),
-                                          key=lambda cidr: cidr[0])
-        #add local gw to front of list
-        for r in range(len(cidr_sorted)):
-            if cidr_sorted[r][2] == 'local':
-                cidr_sorted.insert(0, cidr_sorted.pop(r))
-        return cidr_sorted
+        #sort cidr blocks, with local gateway routes first
+        return sorted(self.routes, key=lambda route: (route[2] != 'local', self.cidr_key(route)))
 
     def register_rt_association(self, subnet_id, rt_assoc_id, az):
         self.associations.append((subnet_id, rt_assoc_id))
-        self.az_connections.append(az)
+        self.az_connections[az] += 1
 
     def get_suggested_az(self):
         if not self.az_connections:
             return NO_AZ
         else:
-            return max(set(self.az_connections), key=self.az_connections.count)
+            return self.az_connections.most_common(1)[0][0]
 
     def simplify_origin(self, origin):
-        if origin == 'EnableVgwRoutePropagation':
-            return 'Propagated'
-        elif origin == 'CreateRoute':
-            return 'Create Route'
-        elif origin == 'CreateRouteTable':
-            return 'Create Table'
-        else:
-            return origin
+        return _ORIGIN_MAP.get(origin, origin)
 
     def add_route(self, dest_cidr, state, gw_id, origin):
         self.routes.append((dest_cidr, state, gw_id, self.simplify_origin(origin)))
@@ -869,7 +977,7 @@ class RouteTableResource:
         insert_text(xml_root, self.id, x, y, dx=0, dy=50)
 
         for assoc in self.associations:
-            route_table_diagram.render_xml_connection(xml_root, "{}_container".format(assoc[0]), text=assoc[1],
+            route_table_diagram.render_xml_connection(xml_root, _container_id(assoc[0]), text=assoc[1],
                                             complex_route=route_generator.get_next_route(x + 50, y + 40))
 
         if len(self.routes) > 0:
@@ -877,26 +985,26 @@ class RouteTableResource:
             fields = ["Destination CIDR", "State", "Gateway ID", "Origin"]
             widths = [DIAGRAM_COL_WIDTH_OVERSIZED, DIAGRAM_COL_WIDTH_SMALL, DIAGRAM_COL_WIDTH_NORMAL, DIAGRAM_COL_WIDTH_NORMAL]
 
-            label = "{}  |  {}".format(self.name, self.id)
+            label = f"{self.name}  |  {self.id}"
             if self.name == "":
                 label = self.id
 
             sorted_routes = self.sort_routes()
 
-            rt_list = DiagramList("{}".format(label),
-                            "{}_list".format(self.id), sorted_routes, fields, widths)
+            rt_list = DiagramList(label,
+                            self.list_id, sorted_routes, fields, widths)
             resource_height = rt_list.render_xml(xml_root, 0, list_y - RESOURCE_DISTRIBUTION)
 
             if ADD_ROUTE_TABLE_CONNECTIONS:
-                routes_connected = []
+                routes_connected = set()
                 route_y = y + padding
                 for route in self.routes:
                     if route[2] not in routes_connected:
                         rt_list.render_xml_connection(xml_root, route[2], complex_route=rt_diagram_route_generator.get_next_route(x, route_y))
-                        routes_connected.append(route[2])
+                        routes_connected.add(route[2])
                         route_y += LINE_BUNDLE_SPACING
 
-        route_table_diagram.render_xml_connection(xml_root, "{}_list".format(self.id), color=RED,
+        route_table_diagram.render_xml_connection(xml_root, self.list_id, color=RED,
                                                     complex_route=list_route_generator.get_next_route(x, y + 10),
                                                     connection_entry=CONNECTION_ENTRY_RIGHT)
         return resource_height
@@ -906,15 +1014,18 @@ class AZResource:
         self.id = id
         self.subnets = []
         self.width_override = (False, 0)
+        self._dim_cache = None
 
     def register_subnet(self, subnet_resource):
         self.subnets.append(subnet_resource)
+        self._dim_cache = None
 
     def get_id(self):
         return self.id
 
     def override_width(self, width):
         self.width_override = (True, width)
+        self._dim_cache = None
 
     def empty(self):
         return len(self.subnets) == 0
@@ -923,17 +1034,20 @@ class AZResource:
         return len(self.subnets)
 
     def get_dimensions(self):
-        w = 0
-        h = PADDING
-        for subnet in self.subnets:
-            (new_w, new_h) = subnet.get_dimensions()
-            w = new_w
-            h += new_h + PADDING
+        #cached until a subnet registration or width override changes the answer
+        if self._dim_cache is not None:
+            return self._dim_cache
+        #pull the cached (w, h) tuples once and aggregate them column-wise
+        dims = [subnet.get_dimensions() for subnet in self.subnets]
+        h = PADDING + sum(subnet_h + PADDING for (_, subnet_h) in dims)
         if self.width_override[0]:
             w = self.width_override[1]
+        elif dims:
+            w = dims[-1][0] + (2 * PADDING)
         else:
-            w = w + (2 * PADDING)
-        return (w, h)
+            w = 2 * PADDING
+        self._dim_cache = (w, h)
+        return self._dim_cache
 
     def render_xml(self, xml_root, x, y, nacl_route_generator, padding=PADDING):
         #render az outline
@@ -942,16 +1056,16 @@ class AZResource:
         #add a box with a dashed outline
         newElement = ET.SubElement(xml_root, "mxCell",
             id=self.id,
-            style="rounded=1;arcSize=10;dashed=1;strokeColor={};fillColor=none;gradientColor=none;dashPattern=8 4;strokeWidth=2;".format(AWS_BORDER_ORANGE),
+            style=AZ_STYLE,
             vertex="1",
             value="",
             parent="1")
 
         ET.SubElement(newElement, "mxGeometry",
-            x="{}".format(x),
-            y="{}".format(y),
-            width="{}".format(width),
-            height="{}".format(height)).set('as','geometry')
+            x=str(x),
+            y=str(y),
+            width=str(width),
+            height=str(height), attrib={'as': 'geometry'})
 
         insert_text(xml_root, self.id, x + int(width / 2) - 40, y + height - 40, font_color=AWS_BORDER_ORANGE)
 
@@ -986,8 +1100,8 @@ class PeeringResource:
         peering_object.render_xml(xml_root)
 
         peering_object.render_xml_connection(xml_root, self.connection, complex_route=route_generator.get_next_route(x + 50, y + 40))
-        insert_text(xml_root, "{}".format(self.name), x, y, dx=50, dy=-10)
-        insert_text(xml_root, "{}".format(self.id), x, y + DIAGRAM_LINE_HEIGHT, dx=50, dy=-10)
+        insert_text(xml_root, f"{self.name}", x, y, dx=50, dy=-10)
+        insert_text(xml_root, f"{self.id}", x, y + DIAGRAM_LINE_HEIGHT, dx=50, dy=-10)
 
 class VpcResource:
     def __init__(self, id, name, cidr):
@@ -999,18 +1113,22 @@ class VpcResource:
         self.cidr = cidr
         self.dns_server_list = []
         self.domain_list = []
+        self._dim_cache = None
 
     def register_az(self, az_resource):
         self.az_list.append(az_resource)
+        self._dim_cache = None
 
     def get_container_id(self):
-        return "{}_container".format(self.id)
+        return _container_id(self.id)
 
     def register_nacl(self, nacl_resource):
         self.nacl_list.append(nacl_resource)
+        self._dim_cache = None
 
     def register_rt(self, rt_resource):
         self.rt_list.append(rt_resource)
+        self._dim_cache = None
 
     def check_empty(self):
         return not self.az_list and not self.nacl_list and not self.rt_list
@@ -1025,15 +1143,18 @@ class VpcResource:
         if self.check_empty():
             return []
         else:
-            az_sorting_list = list(map(lambda az: az.get_id(), self.az_list))
-            az_sorting_list.append(NO_AZ)
-            return sorted(self.rt_list, cmp=lambda rt_one,rt_two: cmp(az_sorting_list.index(rt_one.get_suggested_az()),
-                                                                      az_sorting_list.index(rt_two.get_suggested_az())))
+            #order route tables by the position of their suggested az
+            az_pos = {az.get_id(): i for i, az in enumerate(self.az_list)}
+            az_pos[NO_AZ] = len(az_pos)
+            return sorted(self.rt_list, key=lambda rt: az_pos[rt.get_suggested_az()])
 
     def get_dimensions(self):
         """Determine dimensions based on registered components"""
         if self.check_empty():
             return (VPC_MIN_W, VPC_MIN_H)
+        #the render path asks for vpc dimensions several times per diagram
+        if self._dim_cache is not None:
+            return self._dim_cache
 
         az_combined_height_requirement = RESOURCE_DISTRIBUTION + (2 * PADDING)
         az_max_width_requirement = RESOURCE_DISTRIBUTION + PADDING
@@ -1056,8 +1177,9 @@ class VpcResource:
         if rt_combined_height_requirement > az_combined_height_requirement:
             az_combined_height_requirement = rt_combined_height_requirement
 
-        return (az_max_width_requirement + (5 * PADDING),
-                az_combined_height_requirement + (2 * PADDING))
+        self._dim_cache = (az_max_width_requirement + (5 * PADDING),
+                           az_combined_height_requirement + (2 * PADDING))
+        return self._dim_cache
 
     def render_xml(self, xml_root, x, y, padding=PADDING, vpc_height_override=0):
         #account for nacl and rt row/col
@@ -1085,39 +1207,42 @@ class VpcResource:
             insert_text(xml_root, "Domain Names", x, y + (3 * DIAGRAM_LINE_HEIGHT), dx=text_offset, dy=20)
             list_y = y + (4 * DIAGRAM_LINE_HEIGHT)
             for dn in self.domain_list:
-                insert_text(xml_root, "- {}".format(dn), x, list_y, dx=text_offset, dy=20)
+                insert_text(xml_root, f"- {dn}", x, list_y, dx=text_offset, dy=20)
                 list_y += DIAGRAM_LINE_HEIGHT
 
             insert_text(xml_root, "Domain Name Servers", x, list_y, dx=text_offset, dy=20)
             list_y += DIAGRAM_LINE_HEIGHT
             for dns in self.dns_server_list:
-                insert_text(xml_root,"- {}".format(dns), x, list_y, dx=text_offset, dy=20)
+                insert_text(xml_root, f"- {dns}", x, list_y, dx=text_offset, dy=20)
                 list_y += DIAGRAM_LINE_HEIGHT
 
-        nacl_x = vpc_x + RESOURCE_DISTRIBUTION + (2 * padding)
-        nacl_y = vpc_y + padding
-        nacl_list_route_generator = RouteGroup(-1, y - (2 * padding), Y_DIRECTION)
-
-        for nacl in self.nacl_list:
-            nacl.render_xml(xml_root, nacl_x, nacl_y, nacl_list_route_generator)
-            nacl_x += RESOURCE_DISTRIBUTION
-
-        rt_x = vpc_x + int(padding / 2)
-        rt_y = vpc_y + RESOURCE_DISTRIBUTION + padding
-        rt_list_y = rt_y
-        rt_height = 0
-
-        rt_route_generator = RouteGroup(x + (2 * padding), -1, X_DIRECTION)
-        rt_list_route_generator = RouteGroup(x - 3 * padding, -1, X_DIRECTION)
-        rt_gw_resource_route_generator = RouteGroup((5 * -padding),
-                                                    vpc_y + vpc_height + VPC_GUTTER_DIM,
-                                                    X_DIRECTION,
-                                                    additional_break=vpc_x + vpc_width + VPC_GUTTER_DIM)
-
-        for rt in self.sort_rt_resources():
-            rt_height = rt.render_xml(xml_root, rt_x, rt_y, rt_list_y, rt_route_generator, rt_list_route_generator, rt_gw_resource_route_generator)
-            rt_list_y += max(padding + rt_height, RESOURCE_DISTRIBUTION)
-            rt_y += max(int(rt_height / 1.3), RESOURCE_DISTRIBUTION)
+        #generators are only built for resource lists that have members;
+        #each one carries dispatch state picked at construction
+        if self.nacl_list:
+            nacl_x = vpc_x + RESOURCE_DISTRIBUTION + (2 * padding)
+            nacl_y = vpc_y + padding
+            nacl_list_route_generator = RouteGroup(-1, y - (2 * padding), Y_DIRECTION)
+
+            for nacl in self.nacl_list:
+                nacl.render_xml(xml_root, nacl_x, nacl_y, nacl_list_route_generator)
+                nacl_x += RESOURCE_DISTRIBUTION
+
+        if self.rt_list:
+            rt_x = vpc_x + int(padding / 2)
+            rt_y = vpc_y + RESOURCE_DISTRIBUTION + padding
+            rt_list_y = rt_y
+
+            rt_route_generator = RouteGroup(x + (2 * padding), -1, X_DIRECTION)
+            rt_list_route_generator = RouteGroup(x - 3 * padding, -1, X_DIRECTION)
+            rt_gw_resource_route_generator = RouteGroup((5 * -padding),
+                                                        vpc_y + vpc_height + VPC_GUTTER_DIM,
+                                                        X_DIRECTION,
+                                                        additional_break=vpc_x + vpc_width + VPC_GUTTER_DIM)
+
+            for rt in self.sort_rt_resources():
+                rt_height = rt.render_xml(xml_root, rt_x, rt_y, rt_list_y, rt_route_generator, rt_list_route_generator, rt_gw_resource_route_generator)
+                rt_list_y += max(padding + rt_height, RESOURCE_DISTRIBUTION)
+                rt_y += max(int(rt_height / 1.3), RESOURCE_DISTRIBUTION)
 
         az_x = vpc_x + RESOURCE_DISTRIBUTION
         az_y = vpc_y + RESOURCE_DISTRIBUTION
@@ -1154,32 +1279,38 @@ class RegionResource:
         self.region_name = region_name
         self.width = 0
         self.height = 0
+        self._dim_cache = None
 
     def register_vpc(self, vpc_resource):
         self.vpc = vpc_resource
+        self._dim_cache = None
 
     def get_dimensions(self, region_height_override=0, padding=PADDING):
+        #keyed on the override since render passes it through again
+        if self._dim_cache is not None and self._dim_cache[0] == (region_height_override, padding):
+            return self._dim_cache[1]
         (vpc_width, vpc_height) = self.vpc.get_dimensions()
         width = vpc_width + (2 * padding)
         height = max(vpc_height, region_height_override) + (2 * padding)
-        return (width, height)
+        self._dim_cache = ((region_height_override, padding), (width, height))
+        return self._dim_cache[1]
 
     def render_xml(self, xml_root, x, y, padding=PADDING, region_height_override=0):
 
         (self.width, self.height) = self.get_dimensions(region_height_override=region_height_override)
 
         newElement = ET.SubElement(xml_root, "mxCell",
-            id="{}".format(self.region_name),
-            style="rounded=1;arcSize=6;dashed=1;strokeColor=#000000;fillColor=none;gradientColor=none;dashPattern=8 4;strokeWidth=2;",
+            id=f"{self.region_name}",
+            style=REGION_STYLE,
             value="",
             vertex="1",
             parent="1")
 
         ET.SubElement(newElement, "mxGeometry",
-            x="{}".format(x),
-            y="{}".format(y),
-            width="{}".format(self.width),
-            height="{}".format(self.height)).set('as','geometry')
+            x=str(x),
+            y=str(y),
+            width=str(self.width),
+            height=str(self.height), attrib={'as': 'geometry'})
 
         insert_text(xml_root,self.region_name, x + int(self.width / 2) - 40, y + self.height - 40, font_size=FONT_SIZE_LARGE)
 
@@ -1208,7 +1339,8 @@ class AccountResource:
 
 def visualize_vpc(ec2, region, current_vpc, name, vpc_cidr, dhcp_opts_id, dir, profile, xml_doc):
     """IN: ec2 boto3 client, region name, vpc name (id), vpc name from tags, vpc cidr value, dhcp options id, dir to write to
-       OUT: filename that xml doc was written to"""
+       OUT: filename that xml doc was written to, or the serialized xml bytes when dir is None;
+            None when the vpc holds no resources worth diagramming"""
 
     # anon. fn definitions
     # check if a given resource is in the current vpc
@@ -1222,7 +1354,6 @@ def visualize_vpc(ec2, region, current_vpc, name, vpc_cidr, dhcp_opts_id, dir, p
     #initial resource lists (These are used to store objects created with data from calls to boto3)
     #after creating objects and determining any associations between them, the code for rendering
     #the xml for these objects iterates over these lists
-    az_resources = []
     rt_resources = []
     nacl_resources = []
     subnet_resources = []
@@ -1240,85 +1371,116 @@ def visualize_vpc(ec2, region, current_vpc, name, vpc_cidr, dhcp_opts_id, dir, p
     direct_connect_resources = []
     nacl_association_data = []
 
+    #fire every describe call concurrently: each is an independent https
+    #round-trip and boto3 clients are thread-safe, so the load phase costs
+    #the slowest call rather than the sum of all of them
+    #filter on the vpc server-side where the api supports it, so the wire
+    #payload and the python-side iteration no longer scale with the account
+    vpc_filter = [{'Name': 'vpc-id', 'Values': [current_vpc]}]
+    attachment_filter = [{'Name': 'attachment.vpc-id', 'Values': [current_vpc]}]
+    describe_ops = {
+        'describe_availability_zones': {},
+        'describe_nat_gateways': {'Filters': vpc_filter},
+        'describe_subnets': {'Filters': vpc_filter},
+        'describe_route_tables': {'Filters': vpc_filter},
+        'describe_network_acls': {'Filters': vpc_filter},
+        'describe_internet_gateways': {'Filters': attachment_filter},
+        #peering matches on requester OR accepter vpc, which a single
+        #Filters list cannot express; still filtered client-side below
+        'describe_vpc_peering_connections': {},
+        #DescribeFlowLogs is the odd one out: its parameter is Filter
+        'describe_flow_logs': {'Filter': [{'Name': 'resource-id', 'Values': [current_vpc]}]},
+        'describe_vpc_endpoints': {'Filters': vpc_filter},
+        'describe_vpn_gateways': {'Filters': attachment_filter},
+        'describe_vpn_connections': {},
+        'describe_dhcp_options': {},
+        'describe_egress_only_internet_gateways': {},
+        'describe_prefix_lists': {},
+    }
+    with ThreadPoolExecutor(max_workers=len(describe_ops)) as executor:
+        futures = {op: executor.submit(describe_all, ec2, op, **op_kwargs)
+                   for op, op_kwargs in describe_ops.items()}
+        described = {op: future.result() for op, future in futures.items()}
+
     #load from client
-    for az in ec2.describe_availability_zones()['AvailabilityZones']:
-        az_resources.append(AZResource(az['ZoneName']))
+    az_resources = [AZResource(az['ZoneName'])
+                    for az in described['describe_availability_zones']['AvailabilityZones']]
 
-    for ng in ec2.describe_nat_gateways()['NatGateways']:
-        if in_vpc(ng):
-            ng_resources.append(NgResource(ng['NatGatewayId'], ng['SubnetId'], name_from_tags(ng)))
+    for ng in described['describe_nat_gateways']['NatGateways']:
+        ng_resources.append(NgResource(ng['NatGatewayId'], ng['SubnetId'], name_from_tags(ng)))
 
-    for subnet in ec2.describe_subnets()['Subnets']:
+    #index the azs and nat gateways once; the nested scans here were
+    #O(subnets x azs) and O(subnets x gateways)
+    az_by_id = {az.get_id(): az for az in az_resources}
+    ngs_by_subnet = {}
+    for ng in ng_resources:
+        ngs_by_subnet.setdefault(ng.get_subnet_id(), []).append(ng)
+
+    for subnet in described['describe_subnets']['Subnets']:
         subnet_az = subnet['AvailabilityZone']
         subnet_id = subnet['SubnetId']
-        if in_vpc(subnet):
-            for az in az_resources:
-                # for subnet az
-                if az.get_id() == subnet_az:
-                    new_subnet_resource = SubnetResource(subnet_id, subnet['CidrBlock'], subnet_az, name_from_tags(subnet))
-                    az.register_subnet(new_subnet_resource)
-                    for ng in ng_resources:
-                        if ng.get_subnet_id() == subnet_id:
-                            #add ng to subnet
-                            new_subnet_resource.register_ng(ng)
-                    subnet_resources.append(new_subnet_resource)
-                    break
-
-    for rt in ec2.describe_route_tables()['RouteTables']:
-        if in_vpc(rt):
-            new_rt_resource = RouteTableResource(rt['RouteTableId'], name_from_tags(rt))
-            rt_subnet_associated = False
-            for assoc in rt['Associations']:
-                if 'SubnetId' in assoc:
-                    rt_subnet_az = ""
-                    for subnet_az in subnet_resources:
-                        if assoc['SubnetId'] == subnet_az.get_id():
-                            rt_subnet_az = subnet_az.get_az()
-                    rt_subnet_associated = True
-                    new_rt_resource.register_rt_association(assoc['SubnetId'], assoc['RouteTableAssociationId'], rt_subnet_az)
-            for route in rt['Routes']:
-                #look for available data
-                cidr = ""
-                if 'DestinationCidrBlock' in route:
-                    cidr = route['DestinationCidrBlock']
-                else:
-                    current_prefix = route['DestinationPrefixListId']
-                    for prefix in ec2.describe_prefix_lists()['PrefixLists']:
-                        if prefix['PrefixListId'] == current_prefix:
-                            cidr = prefix['PrefixListName']
-                state = if_in(route, 'State')
-                origin = if_in(route, 'Origin')
-                gw_id = if_in(route, 'GatewayId', 'NetworkInterfaceId', 'VpcPeeringConnectionId')
-                new_rt_resource.add_route(cidr, state, gw_id, origin)
-
-            #add if associated or set to add resources without associations
-            if rt_subnet_associated or not OMIT_NON_ASSOCIATED_RESOURCES:
-                rt_resources.append(new_rt_resource)
-
-    for nacl in ec2.describe_network_acls()['NetworkAcls']:
-        if in_vpc(nacl):
-            new_nacl_resource = NAclResource(nacl['NetworkAclId'], name_from_tags(nacl))
-            for subnet_association in nacl['Associations']:
-                nacl_association_data.append((subnet_association['SubnetId'],
-                                              nacl['NetworkAclId'],
-                                              subnet_association['NetworkAclAssociationId'],
-                                              new_nacl_resource, new_nacl_resource))
-            for rule in nacl['Entries']:
-                new_nacl_resource.add_rule(rule['RuleNumber'], rule['Protocol'],
-                                           rule['Egress'], rule['CidrBlock'],
-                                           rule['RuleAction'])
-
-            if nacl['Associations'] or not OMIT_NON_ASSOCIATED_RESOURCES:
-                nacl_resources.append(new_nacl_resource)
-
-    for igw in ec2.describe_internet_gateways()['InternetGateways']:
+        az = az_by_id.get(subnet_az)
+        if az is not None:
+            new_subnet_resource = SubnetResource(subnet_id, subnet['CidrBlock'], subnet_az, name_from_tags(subnet))
+            az.register_subnet(new_subnet_resource)
+            for ng in ngs_by_subnet.get(subnet_id, []):
+                #add ng to subnet
+                new_subnet_resource.register_ng(ng)
+            subnet_resources.append(new_subnet_resource)
+
+    subnet_by_id = {s.get_id(): s for s in subnet_resources}
+
+    #fetch the prefix lists once up front; the previous per-route lookup made
+    #a full describe_prefix_lists round-trip for every prefix-list route
+    prefix_map = {p['PrefixListId']: p['PrefixListName'] for p in described['describe_prefix_lists']['PrefixLists']}
+
+    for rt in described['describe_route_tables']['RouteTables']:
+        new_rt_resource = RouteTableResource(rt['RouteTableId'], name_from_tags(rt))
+        rt_subnet_associated = False
+        for assoc in rt['Associations']:
+            if 'SubnetId' in assoc:
+                rt_subnet = subnet_by_id.get(assoc['SubnetId'])
+                rt_subnet_az = rt_subnet.get_az() if rt_subnet else ""
+                rt_subnet_associated = True
+                new_rt_resource.register_rt_association(assoc['SubnetId'], assoc['RouteTableAssociationId'], rt_subnet_az)
+        for route in rt['Routes']:
+            #look for available data
+            if 'DestinationCidrBlock' in route:
+                cidr = route['DestinationCidrBlock']
+            else:
+                cidr = prefix_map.get(route['DestinationPrefixListId'], "")
+            state = if_in(route, 'State')
+            origin = if_in(route, 'Origin')
+            gw_id = if_in(route, 'GatewayId', 'NetworkInterfaceId', 'VpcPeeringConnectionId')
+            new_rt_resource.add_route(cidr, state, gw_id, origin)
+
+        #add if associated or set to add resources without associations
+        if rt_subnet_associated or not OMIT_NON_ASSOCIATED_RESOURCES:
+            rt_resources.append(new_rt_resource)
+
+    for nacl in described['describe_network_acls']['NetworkAcls']:
+        new_nacl_resource = NAclResource(nacl['NetworkAclId'], name_from_tags(nacl))
+        for subnet_association in nacl['Associations']:
+            nacl_association_data.append((subnet_association['SubnetId'],
+                                          nacl['NetworkAclId'],
+                                          subnet_association['NetworkAclAssociationId'],
+                                          new_nacl_resource, new_nacl_resource))
+        for rule in nacl['Entries']:
+            new_nacl_resource.add_rule(rule['RuleNumber'], rule['Protocol'],
+                                       rule['Egress'], rule['CidrBlock'],
+                                       rule['RuleAction'])
+
+        if nacl['Associations'] or not OMIT_NON_ASSOCIATED_RESOURCES:
+            nacl_resources.append(new_nacl_resource)
+
+    for igw in described['describe_internet_gateways']['InternetGateways']:
         for attached in igw['Attachments']:
             if in_vpc(attached):
                 igw_resources.append(IgwResource(igw['InternetGatewayId'], current_vpc, name_from_tags(igw)))
                 for ng_igw in ng_resources:
                     ng_igw.register_igw(igw['InternetGatewayId'])
 
-    for peering in ec2.describe_vpc_peering_connections()['VpcPeeringConnections']:
+    for peering in described['describe_vpc_peering_connections']['VpcPeeringConnections']:
         requesting_vpc = peering['RequesterVpcInfo']['VpcId']
         accepting_vpc = peering['AccepterVpcInfo']['VpcId']
         if requesting_vpc == current_vpc or accepting_vpc == current_vpc:
@@ -1338,79 +1500,75 @@ def visualize_vpc(ec2, region, current_vpc, name, vpc_cidr, dhcp_opts_id, dir, p
                                                    accepting_vpc,
                                                    requesting_vpc,
                                                    name_from_tags(peering),
-                                                   "{}_container".format(peer_vpc_id))
+                                                   _container_id(peer_vpc_id))
 
             new_peering_resource.register_diagram_vpc(current_vpc)
             peering_resources.append(new_peering_resource)
 
-    for flow_logs in ec2.describe_flow_logs()['FlowLogs']:
+    for flow_logs in described['describe_flow_logs']['FlowLogs']:
         if flow_logs['ResourceId'] == current_vpc:
             flow_logs_resources.append(FlowLogsResource(flow_logs['FlowLogId'], name_from_tags(flow_logs)))
 
-    existing_resource_endpoints = []
-    for vpc_endpoint in ec2.describe_vpc_endpoints()['VpcEndpoints']:
-        if in_vpc(vpc_endpoint):
-            add_new = True
-            for existing_service in existing_resource_endpoints:
-                if existing_service.get_servicename() == vpc_endpoint['ServiceName']:
-                    #if endpoint for service already exists, add vpce id to existing instead of creating new resource
-                    existing_service.add_vpce_id(vpc_endpoint['VpcEndpointId'])
-                    add_new = False
-                    for rt in vpc_endpoint['RouteTableIds']:
-                        existing_service.register_rt_association(rt)
-                    break
+    endpoints_by_service = {}
+    for vpc_endpoint in described['describe_vpc_endpoints']['VpcEndpoints']:
+        endpoint_resource = endpoints_by_service.get(vpc_endpoint['ServiceName'])
+        if endpoint_resource is None:
+            endpoint_resource = VpcEndpointResource(vpc_endpoint['ServiceName'],
+                                                    vpc_endpoint['VpcEndpointType'])
+            endpoints_by_service[vpc_endpoint['ServiceName']] = endpoint_resource
+            endpoints_resources.append(endpoint_resource)
 
-            if add_new:
-                new_endpoint_resource = VpcEndpointResource(vpc_endpoint['ServiceName'],
-                                                            vpc_endpoint['VpcEndpointType'])
+        #additional endpoints for an existing service add their vpce id to
+        #that resource instead of creating a new one
+        endpoint_resource.add_vpce_id(vpc_endpoint['VpcEndpointId'])
 
-                new_endpoint_resource.add_vpce_id(vpc_endpoint['VpcEndpointId'])
+        for rt in vpc_endpoint['RouteTableIds']:
+            endpoint_resource.register_rt_association(rt)
 
-                for rt in vpc_endpoint['RouteTableIds']:
-                    new_endpoint_resource.register_rt_association(rt)
+    #one describe_vpn_connections call serves every gateway attachment
+    vpn_by_gw = {c['VpnGatewayId']: c['VpnConnectionId']
+                 for c in described['describe_vpn_connections']['VpnConnections'] if 'VpnGatewayId' in c}
 
-                existing_resource_endpoints.append(new_endpoint_resource)
-                endpoints_resources.append(new_endpoint_resource)
-
-    for vpn_gw in ec2.describe_vpn_gateways()['VpnGateways']:
+    for vpn_gw in described['describe_vpn_gateways']['VpnGateways']:
         for attachment in vpn_gw['VpcAttachments']:
             if in_vpc(attachment):
-                vpn = ""
-                for conn in ec2.describe_vpn_connections()['VpnConnections']:
-                    if conn['VpnGatewayId'] == vpn_gw['VpnGatewayId']:
-                        vpn = conn['VpnConnectionId']
+                vpn = vpn_by_gw.get(vpn_gw['VpnGatewayId'], "")
                 vpn_gw_resources.append(VpnGatewayResource(vpn_gw['VpnGatewayId'], name_from_tags(vpn_gw), vpn))
 
-    for dhcp_opts in ec2.describe_dhcp_options()['DhcpOptions']:
+    for dhcp_opts in described['describe_dhcp_options']['DhcpOptions']:
         if dhcp_opts_id == dhcp_opts['DhcpOptionsId']:
-            for opt in dhcp_opts['DhcpConfigurations']:
-                if opt['Key'] == 'domain-name-servers':
-                    for val in opt['Values']:
-                        dhcp_opt_dns_servers.append(val['Value'])
-                elif opt['Key'] == 'domain-name':
-                    for val in opt['Values']:
-                        dhcp_opt_domains.append(val['Value'])
-
-    for egress_gateway in ec2.describe_egress_only_internet_gateways()['EgressOnlyInternetGateways']:
+            dhcp_opt_dns_servers = [val['Value'] for opt in dhcp_opts['DhcpConfigurations']
+                                    if opt['Key'] == 'domain-name-servers' for val in opt['Values']]
+            dhcp_opt_domains = [val['Value'] for opt in dhcp_opts['DhcpConfigurations']
+                                if opt['Key'] == 'domain-name' for val in opt['Values']]
+
+    for egress_gateway in described['describe_egress_only_internet_gateways']['EgressOnlyInternetGateways']:
         for attached in egress_gateway['Attachments']:
             if in_vpc(attached):
                 egress_gateway_resources.append(IgwResource(egress_gateway['EgressOnlyInternetGatewayId'], current_vpc, name_from_tags(egress_gateway)))
 
     #create direct connect client for specialized boto3 request
-    dc_client = SESSION.client('directconnect')
-    for dc in dc_client.describe_direct_connect_gateways()['directConnectGateways']:
+    dc_client = get_client('directconnect')
+    vpn_gw_ids = {vg_dc.get_id() for vg_dc in vpn_gw_resources}
+    for dc in describe_all(dc_client, 'describe_direct_connect_gateways')['directConnectGateways']:
         id = dc['directConnectGatewayId']
-        dc_association_list = dc_client.describe_direct_connect_gateway_associations(directConnectGatewayId=id)['directConnectGatewayAssociations']
-        new_direct_connect_resource = DirectConnectResource(id, dc['directConnectGatewayName'])
-        dc_associated = False
-        for assoc in dc_association_list:
-            for vg_dc in vpn_gw_resources:
-                if assoc['virtualGatewayId'] == vg_dc.get_id():
-                    dc_associated = True
-                    new_direct_connect_resource.add_association(assoc['virtualGatewayId'])
-        if dc_associated:
+        dc_association_list = describe_all(dc_client, 'describe_direct_connect_gateway_associations', directConnectGatewayId=id)['directConnectGatewayAssociations']
+        associated_vgws = [assoc['virtualGatewayId'] for assoc in dc_association_list
+                           if assoc['virtualGatewayId'] in vpn_gw_ids]
+        if associated_vgws:
+            new_direct_connect_resource = DirectConnectResource(id, dc['directConnectGatewayName'])
+            for vgw in associated_vgws:
+                new_direct_connect_resource.add_association(vgw)
             direct_connect_resources.append(new_direct_connect_resource)
 
+    #empty scratch VPCs produce a diagram with nothing in it; skip the
+    #whole layout/serialize/upload pass for them
+    if not any((subnet_resources, rt_resources, nacl_resources, ng_resources,
+                igw_resources, peering_resources, flow_logs_resources,
+                endpoints_resources, vpn_gw_resources, peer_vpc_resources,
+                egress_gateway_resources, direct_connect_resources)):
+        return None
+
     current_vpc_resource = VpcResource(current_vpc, name, vpc_cidr)
     current_vpc_resource.add_dns_servers_from_opts(dhcp_opt_dns_servers)
     current_vpc_resource.add_domains_from_opts(dhcp_opt_domains)
@@ -1420,9 +1578,9 @@ def visualize_vpc(ec2, region, current_vpc, name, vpc_cidr, dhcp_opts_id, dir, p
         current_vpc_resource.register_az(az)
 
     for assoc in nacl_association_data:
-        for sub in subnet_resources:
-            if assoc[0] == sub.get_id():
-                sub.register_nacl_association(assoc)
+        sub = subnet_by_id.get(assoc[0])
+        if sub is not None:
+            sub.register_nacl_association(assoc)
 
     for rt in rt_resources:
         current_vpc_resource.register_rt(rt)
@@ -1439,7 +1597,12 @@ def visualize_vpc(ec2, region, current_vpc, name, vpc_cidr, dhcp_opts_id, dir, p
     region.register_vpc(current_vpc_resource)
 
     #render diagram elements
-    external_resource_space = (RESOURCE_DISTRIBUTION + (RESOURCE_DISTRIBUTION *
+    #module constants bind to locals once; the placement code below reads
+    #them once per resource otherwise
+    rd = RESOURCE_DISTRIBUTION
+    pad = PADDING
+    gutter = VPC_GUTTER_DIM
+    external_resource_space = (rd + (rd *
                                     (len(peering_resources) +
                                      len(igw_resources) +
                                      len(endpoints_resources) +
@@ -1448,115 +1611,112 @@ def visualize_vpc(ec2, region, current_vpc, name, vpc_cidr, dhcp_opts_id, dir, p
 
     account = AccountResource(profile)
     region_dimensions = region.get_dimensions(region_height_override=external_resource_space)
-    region_bottom_y = region_dimensions[1] + VPC_GUTTER_DIM
-    region_right_x = region_dimensions[0] + VPC_GUTTER_DIM
-    account.set_dimensions(region_right_x + VPC_GUTTER_DIM + RESOURCE_DISTRIBUTION + PADDING,
-                           region_bottom_y + PADDING)
-    account.render_xml(xml_root, -PADDING,0)
+    region_bottom_y = region_dimensions[1] + gutter
+    region_right_x = region_dimensions[0] + gutter
+    account.set_dimensions(region_right_x + gutter + rd + pad,
+                           region_bottom_y + pad)
+    account.render_xml(xml_root, -pad,0)
 
-    region.render_xml(xml_root, VPC_GUTTER_DIM, VPC_GUTTER_DIM, region_height_override=external_resource_space)
+    region.render_xml(xml_root, gutter, gutter, region_height_override=external_resource_space)
 
     #add resources not explicitly in the formatted region
-    peering_x = VPC_GUTTER_DIM + int(PADDING / 2) + current_vpc_resource.get_dimensions()[0]
-    peering_y = VPC_GUTTER_DIM + PADDING + RESOURCE_DISTRIBUTION
-    peering_route_generator = RouteGroup(peering_x + (2 * RESOURCE_DISTRIBUTION) + PADDING, -1, X_DIRECTION)
-
-    for conn in peering_resources:
-        conn.render_xml(xml_root, peering_x, peering_y, peering_route_generator)
-        peering_y += RESOURCE_DISTRIBUTION
-
-    igw_x = peering_x
-    igw_y = peering_y
-    for igw in igw_resources:
-        igw.render_xml(xml_root, igw_x, igw_y)
-        igw_y += RESOURCE_DISTRIBUTION
-
-    end_pt_route_generator = RouteGroup(VPC_GUTTER_DIM + int(PADDING / 2), -1, X_DIRECTION)
-    ep_x = igw_x
-    ep_y = igw_y
-    for ep in endpoints_resources:
-        ep.render_xml(xml_root, ep_x, ep_y, end_pt_route_generator)
-        ep_y += RESOURCE_DISTRIBUTION
-
-    vpn_x = ep_x
-    vpn_y = ep_y
-    for vpn in vpn_gw_resources:
-        vpn.render_xml(xml_root, vpn_x, vpn_y)
-        vpn_y += RESOURCE_DISTRIBUTION
-
-    egress_gw_x = peering_x
-    egress_gw_y = vpn_y
-    for egw in egress_gateway_resources:
-        egw.render_xml(xml_root, egress_gw_x, egress_gw_y)
-        egress_gw_y += RESOURCE_DISTRIBUTION
-
-    original_peer_vpc_spacing = peering_x + VPC_GUTTER_DIM
+    (vpc_w, vpc_h) = current_vpc_resource.get_dimensions()
+    peering_x = gutter + int(pad / 2) + vpc_w
+    peering_y = gutter + pad + rd
+    peering_route_generator = RouteGroup(peering_x + (2 * rd) + pad, -1, X_DIRECTION)
+
+    end_pt_route_generator = RouteGroup(gutter + int(pad / 2), -1, X_DIRECTION)
+
+    #the peering/igw/endpoint/vpn/egress stacks all share peering_x and one
+    #continuously advancing y, so a single driver places all five groups;
+    #each entry carries the extra render_xml args its group needs
+    stacked_groups = ((peering_resources, (peering_route_generator,)),
+                      (igw_resources, ()),
+                      (endpoints_resources, (end_pt_route_generator,)),
+                      (vpn_gw_resources, ()),
+                      (egress_gateway_resources, ()))
+
+    stack_y = peering_y
+    for resources, extra_args in stacked_groups:
+        for resource in resources:
+            resource.render_xml(xml_root, peering_x, stack_y, *extra_args)
+            stack_y += rd
+
+    #bottom of the vpn group, where the direct connect stack anchors
+    vpn_y = peering_y + rd * (len(peering_resources) + len(igw_resources) +
+                                                 len(endpoints_resources) + len(vpn_gw_resources))
+
+    original_peer_vpc_spacing = peering_x + gutter
     if ADD_ROUTE_TABLE_CONNECTIONS:
-        original_peer_vpc_spacing += VPC_GUTTER_DIM
+        original_peer_vpc_spacing += gutter
 
-    peer_vpc_x = original_peer_vpc_spacing
-    peer_vpc_y = VPC_GUTTER_DIM + PADDING + RESOURCE_DISTRIBUTION - 20
-    peer_empty_dim = (0, 0)
     if peer_vpc_resources:
-        peer_empty_dim = peer_vpc_resources[0].get_dimensions()
-
-    count_right = 0
-    for peer_vpc in peer_vpc_resources:
-        if count_right == VPC_PEER_COLS:
-            peer_vpc_x = original_peer_vpc_spacing
-            peer_vpc_y += peer_empty_dim[1] + PADDING
-            count_right = 0
-        peer_vpc.render_xml(xml_root, peer_vpc_x, peer_vpc_y)
-        peer_vpc_x += peer_empty_dim[0] + PADDING
-        count_right += 1
-
-    fl_x = VPC_GUTTER_DIM + RESOURCE_DISTRIBUTION + PADDING
-    fl_y = VPC_GUTTER_DIM + PADDING - 30
-    for fl in flow_logs_resources:
-        fl.render_xml(xml_root, fl_x, fl_y)
-        fl_x += RESOURCE_DISTRIBUTION
+        peer_vpc_y = gutter + pad + rd - 20
+        (peer_w, peer_h) = peer_vpc_resources[0].get_dimensions()
+        step_x = peer_w + pad
+        step_y = peer_h + pad
+
+        #grid position comes straight from the index, so the loop carries no
+        #wrap-around state or column counter
+        for i, peer_vpc in enumerate(peer_vpc_resources):
+            (row, col) = divmod(i, VPC_PEER_COLS)
+            peer_vpc.render_xml(xml_root,
+                                original_peer_vpc_spacing + col * step_x,
+                                peer_vpc_y + row * step_y)
+
+    #like the peer grid, these rows index straight into closed-form
+    #coordinates rather than mutating an accumulator per iteration
+    fl_x = gutter + rd + pad
+    fl_y = gutter + pad - 30
+    for i, fl in enumerate(flow_logs_resources):
+        fl.render_xml(xml_root, fl_x + i * rd, fl_y)
 
     dc_x = original_peer_vpc_spacing
-    dc_y = vpn_y - RESOURCE_DISTRIBUTION
-    for dc in direct_connect_resources:
-        dc.render_xml(xml_root, dc_x, dc_y)
-        dc_y += RESOURCE_DISTRIBUTION
-
-    #create xml and write to file
-    xml_diagram_tree = ET.ElementTree(xml_doc)
-    filename = "{}.xml".format(current_vpc)
-    save_path = "{}{}".format(make_save_location(dir), filename)
-    xml_diagram_tree.write(save_path)
+    dc_y = vpn_y - rd
+    for i, dc in enumerate(direct_connect_resources):
+        dc.render_xml(xml_root, dc_x, dc_y + i * rd)
+
+    #dir=None hands the serialized bytes straight back so the lambda path
+    #can upload without a /tmp round-trip
+    if dir is None:
+        return ET.tostring(xml_doc, encoding='utf-8', xml_declaration=True)
+
+    #on disk, stream the tree through the buffered file instead of
+    #materializing a second full copy of the document as a byte string
+    save_path = os.path.join(make_save_location(dir), f"{current_vpc}.xml")
+    with open(save_path, 'wb', buffering=1 << 20) as xml_file:
+        ET.ElementTree(xml_doc).write(xml_file, encoding='utf-8', xml_declaration=True)
     return save_path
 
 def main(profile, region, vpc_name, save_directory):
 
-    vpc_exists = False
-    ec2 = SESSION.client('ec2')
+    ec2 = get_client('ec2')
 
-    available_vpcs = []
-    for vpc in ec2.describe_vpcs()['Vpcs']:
-        available_vpcs.append(vpc['VpcId'])
-        if vpc['VpcId'] == vpc_name:
-            vpc_exists = True
-            cidr = vpc['CidrBlock']
-            name = name_from_tags(vpc)
-            dhcp_opts = vpc['DhcpOptionsId']
-            break
+    #key the paginated results by id: O(1) membership, and the not-found
+    #message can list every VPC instead of stopping at the first match
+    vpcs_by_id = {vpc['VpcId']: vpc
+                  for page in ec2.get_paginator('describe_vpcs').paginate()
+                  for vpc in page['Vpcs']}
 
-    if vpc_exists:
+    vpc = vpcs_by_id.get(vpc_name)
+    if vpc is not None:
         doc = create_xml_doc()
-        filename = visualize_vpc(ec2, region, vpc_name, name, cidr, dhcp_opts, save_directory, profile, doc)
-        print("Wrote diagram to {}".format(filename))
+        filename = visualize_vpc(ec2, region, vpc_name, name_from_tags(vpc),
+                                 vpc['CidrBlock'], vpc['DhcpOptionsId'],
+                                 save_directory, profile, doc)
+        if filename is None:
+            print(f"Vpc: {vpc_name} has no resources to diagram")
+        else:
+            print(f"Wrote diagram to {filename}")
         return 0
 
     else:
-        print("\nVpc: {} not found\n".format(vpc_name))
-        print("The following vpcs exist in profile: {}, region: {}:\n".format(profile, region))
+        print(f"\nVpc: {vpc_name} not found\n")
+        print(f"The following vpcs exist in profile: {profile}, region: {region}:\n")
 
         #list vpcs available
-        for existing_vpc in available_vpcs:
-            print("->\t {}".format(existing_vpc))
+        for existing_vpc in sorted(vpcs_by_id):
+            print(f"->\t {existing_vpc}")
         print("")
 
         exit(1)
@@ -1564,35 +1724,57 @@ def main(profile, region, vpc_name, save_directory):
 def lambda_handler(json_input, context):
     """aws lambda-specific execution procedure"""
 
-    ec2 = SESSION.client('ec2')
-    region = SESSION.region_name
-    s3_client = SESSION.client('s3')
+    #lambda routes stdout through cloudwatch line by line; logger.info with
+    #lazy %-formatting batches better and skips the string build when the
+    #level is raised
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+
+    ec2 = get_client('ec2')
+    region = get_session().region_name
+    s3_client = get_client('s3')
 
     #retrieve environment variables
     bucket = os.environ['OUTPUT_BUCKET']
     account_name = os.environ['ACCOUNT_NAME']
 
-    for vpc in ec2.describe_vpcs()['Vpcs']:
-        vpc_id = vpc['VpcId']
-        cidr = vpc['CidrBlock']
-        name = name_from_tags(vpc)
-        dhcp_opts = vpc['DhcpOptionsId']
-        new_doc = create_xml_doc()
-        filename = visualize_vpc(ec2,region,vpc_id,name,cidr,dhcp_opts,"/tmp",account_name,new_doc)
-
-        print("LOG Wrote diagram to {}".format(filename))
-
-        #upload file to s3
-        with open(filename) as upload_file:
-            output_filename = "{}.xml".format(vpc_id)
-
-            print("LOG Writing {} to s3://{}/{}".format(filename, bucket, output_filename))
-
-            object = upload_file.read()
-            s3_client.put_object(Body=object,
-                                 Bucket=bucket,
-                                 Key=output_filename,
-                                 ContentType='application/xml')
+    #the mxGraph shell is identical for every VPC; deepcopy of the small
+    #template is cheaper than rebuilding it through the Element code path
+    doc_template = create_xml_doc()
+
+    #uploads overlap with building the next diagram; boto3 clients are
+    #thread-safe so one s3 client serves the whole pool
+    with ThreadPoolExecutor(max_workers=8) as uploader:
+        upload_futures = []
+        for page in ec2.get_paginator('describe_vpcs').paginate():
+            for vpc in page['Vpcs']:
+                vpc_id = vpc['VpcId']
+                cidr = vpc['CidrBlock']
+                name = name_from_tags(vpc)
+                dhcp_opts = vpc['DhcpOptionsId']
+                new_doc = copy.deepcopy(doc_template)
+                xml_bytes = visualize_vpc(ec2,region,vpc_id,name,cidr,dhcp_opts,None,account_name,new_doc)
+
+                if xml_bytes is None:
+                    logger.info("Skipping %s: no resources to diagram", vpc_id)
+                    continue
+
+                #upload the serialized diagram to s3 without touching /tmp
+                output_filename = f"{vpc_id}.xml"
+
+                logger.info("Writing %s to s3://%s/%s", vpc_id, bucket, output_filename)
+
+                upload_futures.append(uploader.submit(s3_client.put_object,
+                                                      Body=xml_bytes,
+                                                      Bucket=bucket,
+                                                      Key=output_filename,
+                                                      ContentType='application/xml'))
+
+        #surface any upload failure before the handler returns
+        for future in upload_futures:
+            future.result()
+
+    logger.info("Uploaded %d diagrams to s3://%s", len(upload_futures), bucket)
 
 if __name__ == "__main__":
     main(args.profile, args.region, args.vpc, args.directory)
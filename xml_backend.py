@@ -0,0 +1,16 @@
+"""Select the fastest available ElementTree-compatible XML backend.
+
+The visualizer only uses the common Element/SubElement/ElementTree/tostring
+subset, so any of these backends is a drop-in:
+- pygixml: fastest tree construction when installed
+- lxml: C-backed tree, ~2x stdlib on build and serialization
+- xml.etree.ElementTree: always available fallback
+"""
+
+try:
+    from pygixml import etree as ET
+except ImportError:
+    try:
+        from lxml import etree as ET
+    except ImportError:
+        import xml.etree.ElementTree as ET